@@ -7,13 +7,60 @@ Behavior:
 - Tries connecting to known nodes; the leader accepts clients, others reply with "NOT_LEADER"
 - After connecting to a leader, read stdin lines and send them; print incoming broadcast messages
 """
+import os
+import selectors
 import socket
 import struct
-import time
+import sys
 import threading
+import time
 
 MCAST_GRP = '224.1.1.1'
 MCAST_PORT = 50000
+# discovery datagram: tag, node id, IPv4 address, ring port, client port
+HELLO_MSG = struct.Struct('!Bq4sHH')
+HELLO_TAG = 1
+
+# same framing as the nodes: 4-byte big-endian length + payload
+FRAME_HDR = struct.Struct('!I')
+MAX_FRAME = 64 * 1024
+# the leader drops clients that send frames over MAX_FRAME, and prepends
+# "[room] " before relaying; keep our own messages well below that
+MAX_MESSAGE = MAX_FRAME - 1024
+
+
+def send_frame(sock, payload):
+    if len(payload) > MAX_FRAME:
+        raise ValueError(f"frame of {len(payload)} bytes exceeds {MAX_FRAME}")
+    sock.sendall(FRAME_HDR.pack(len(payload)) + payload)
+
+
+def _recv_exact(sock, buf, n):
+    view = memoryview(buf)
+    off = 0
+    try:
+        while off < n:
+            k = sock.recv_into(view[off:n])
+            if k == 0:
+                return False
+            off += k
+    finally:
+        view.release()
+    return True
+
+
+def recv_frame(sock, buf):
+    """Read one frame into buf; returns the payload length or -1 on EOF/bad frame."""
+    if not _recv_exact(sock, buf, FRAME_HDR.size):
+        return -1
+    (n,) = FRAME_HDR.unpack_from(buf)
+    if n > MAX_FRAME:
+        return -1
+    if n > len(buf):
+        buf.extend(bytes(n - len(buf)))
+    if not _recv_exact(sock, buf, n):
+        return -1
+    return n
 
 
 def discover(timeout=2.0):
@@ -28,13 +75,11 @@ def discover(timeout=2.0):
     try:
         while time.time() - t0 < timeout:
             data, addr = sock.recvfrom(1024)
-            parts = data.decode().strip().split()
-            if len(parts) >= 5 and parts[0] == 'HELLO':
-                nid = int(parts[1])
-                host = parts[2]
-                rp = int(parts[3])
-                cp = int(parts[4])
-                nodes[nid] = (host, cp)
+            if len(data) != HELLO_MSG.size:
+                continue
+            tag, nid, ip, rp, cp = HELLO_MSG.unpack(data)
+            if tag == HELLO_TAG:
+                nodes[nid] = (socket.inet_ntoa(ip), cp)
     except socket.timeout:
         pass
     return nodes
@@ -44,13 +89,18 @@ def try_connect(nodes):
     for nid, (host, port) in sorted(nodes.items()):
         try:
             s = socket.create_connection((host, port), timeout=1)
+            # send typed lines immediately, leave room for bursts of broadcasts
+            s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
             s.settimeout(1.0)
             try:
-                data = s.recv(32)
-                if data.strip() == b'NOT_LEADER':
+                buf = bytearray(32)
+                n = recv_frame(s, buf)
+                data = bytes(buf[:n]) if n >= 0 else b''
+                if data == b'NOT_LEADER':
                     s.close()
                     continue
-                if data.strip() == b'WELCOME':
+                if data == b'WELCOME':
                     s.settimeout(None)
                     return s
                 # unknown response: close and continue
@@ -79,62 +129,160 @@ def connect_to_leader_loop():
         time.sleep(1.0)
 
 
-def main():
-    print('Discovering nodes / connecting to leader...')
+def reconnect(sel, s):
+    try:
+        sel.unregister(s)
+    except (KeyError, ValueError):
+        pass
+    try:
+        s.close()
+    except Exception:
+        pass
     s = connect_to_leader_loop()
-    print('Connected to leader. Type messages and press Enter.')
+    print("Reconnected to new leader.")
+    sel.register(s, selectors.EVENT_READ)
+    return s
+
+
+def open_stdin(sel):
+    """
+    Register stdin on sel and return the object its events arrive on.
+    If stdin can't be polled (regular file or /dev/null under epoll, or
+    Windows, where select() only takes sockets), a reader thread copies
+    it into a socketpair that is registered instead.
+    """
+    fd = sys.stdin.fileno()
+    if sys.platform != 'win32':
+        try:
+            sel.register(fd, selectors.EVENT_READ)
+            return fd
+        except (OSError, ValueError):
+            pass
+    r, w = socket.socketpair()
 
-    disconnected = threading.Event()
-    cname = input("Enter your name: ").strip()
-    def recv_loop(sock):
+    def pump():
         try:
-            f = sock.makefile('r')
-            for line in f:
-                if not line:
+            while True:
+                chunk = os.read(fd, 4096)
+                if not chunk:
                     break
+                w.sendall(chunk)
+        except OSError:
+            pass
+        finally:
+            # closing signals EOF to the selector loop
+            w.close()
 
-                line = line.rstrip('\n')
+    threading.Thread(target=pump, daemon=True).start()
+    sel.register(r, selectors.EVENT_READ)
+    return r
 
-                if line == "NOT_LEADER":
-                    print("Server is not leader anymore. Reconnecting...")
-                    break   # ✅ jetzt korrekt
 
-                print(line)
+def read_stdin(src):
+    # raw read: a buffered readline could hide lines from select
+    if isinstance(src, int):
+        return os.read(src, 4096)
+    return src.recv(4096)
 
-        except Exception:
-            pass
-        finally:
-            disconnected.set()
-            try:
-                sock.close()
-            except Exception:
-                pass
 
+class ChatSession:
+    """Connection to the leader plus the stdin/socket buffers of one client run."""
 
-    threading.Thread(target=recv_loop, args=(s,), daemon=True).start()
+    def __init__(self, sel, sock):
+        self.sel = sel
+        self.sock = sock
+        self.cname = None  # first stdin line
+        self.pending = bytearray()  # stdin bytes without a newline yet
+        self.inbuf = bytearray()  # received bytes not yet forming a whole frame
+        self.view = memoryview(bytearray(4096))
 
-    try:
+    def reconnect(self):
+        self.sock = reconnect(self.sel, self.sock)
+        self.inbuf.clear()
+
+    def on_stdin(self, src):
+        chunk = read_stdin(src)
+        if not chunk:
+            raise EOFError
+        pending = self.pending
+        pending += chunk
         while True:
-            line = cname +': ' + input()
+            i = pending.find(b'\n')
+            if i < 0:
+                break
+            text = pending[:i].decode(errors='replace').rstrip('\r')
+            del pending[:i + 1]
+            if self.cname is None:
+                self.cname = text.strip()
+                continue
+            self.send_line(self.cname + ': ' + text)
 
-            # If connection died, reconnect automatically
-            if disconnected.is_set():
-                print("Disconnected from leader. Reconnecting...")
-                disconnected.clear()
-                s = connect_to_leader_loop()
-                print("Reconnected to new leader.")
-                threading.Thread(target=recv_loop, args=(s,), daemon=True).start()
+    def send_line(self, line):
+        data = line.encode()
+        if len(data) > MAX_MESSAGE:
+            print(f"Message too long ({len(data)} bytes, max {MAX_MESSAGE}); not sent.")
+            return
+        try:
+            send_frame(self.sock, data)
+        except (BrokenPipeError, ConnectionResetError, OSError):
+            print("Send failed (leader likely down). Reconnecting...")
+            self.reconnect()
 
-            try:
-                s.sendall((line + '\n').encode())
-            except (BrokenPipeError, ConnectionResetError, OSError):
-                print("Send failed (leader likely down). Reconnecting...")
-                disconnected.set()
-                continue
+    def on_socket(self):
+        try:
+            n = self.sock.recv_into(self.view)
+        except OSError:
+            n = 0
+        if n == 0:
+            print("Disconnected from leader. Reconnecting...")
+            self.reconnect()
+            return
+        inbuf = self.inbuf
+        inbuf += self.view[:n]
+        hdr = FRAME_HDR.size
+        while len(inbuf) >= hdr:
+            (size,) = FRAME_HDR.unpack_from(inbuf)
+            if size > MAX_FRAME:
+                print("Bad frame from leader. Reconnecting...")
+                self.reconnect()
+                return
+            end = hdr + size
+            if len(inbuf) < end:
+                return
+            line = bytes(inbuf[hdr:end])
+            del inbuf[:end]
+
+            if line == b"NOT_LEADER":
+                print("Server is not leader anymore. Reconnecting...")
+                self.reconnect()
+                return
+
+            # decode only for display
+            print(line.decode(errors='replace'))
 
+
+def main():
+    print('Discovering nodes / connecting to leader...')
+    s = connect_to_leader_loop()
+    print('Connected to leader. Type messages and press Enter.')
+    print("Enter your name: ", end='', flush=True)
+
+    # stdin and the leader socket share one selector
+    sel = selectors.DefaultSelector()
+    stdin_src = open_stdin(sel)
+    sel.register(s, selectors.EVENT_READ)
+    chat = ChatSession(sel, s)
+    try:
+        while True:
+            for key, _ in sel.select():
+                if key.fileobj is stdin_src:
+                    chat.on_stdin(stdin_src)
+                elif key.fileobj is chat.sock:
+                    chat.on_socket()
+                # else: socket replaced by a reconnect earlier in this batch
     except (KeyboardInterrupt, EOFError):
         try:
-            s.close()
+            chat.sock.close()
         except Exception:
             pass
 
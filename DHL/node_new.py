@@ -5,25 +5,53 @@ Simple single-machine distributed node simulation.
 Features:
 - UDP multicast discovery
 - Ring formation (each node learns left/right neighbors)
-- LCR leader election over TCP ring links
+- LCR leader election over UDP ring links
 - Leader broadcasts HEARTBEAT token around ring
 - Leader accepts chat clients; leader broadcasts client messages to connected clients
 
 Run multiple copies on one machine to simulate nodes.
 """
 import argparse
+import bisect
+import functools
+import heapq
+import itertools
+import math
+import selectors
 import socket
 import struct
 import threading
 import time
+import traceback
 import random
+import select
 import sys
 
 MCAST_GRP = '224.1.1.1'
 MCAST_PORT = 50000
 HELLO_INTERVAL = 1.0
+# discovery datagram: tag, node id, IPv4 address, ring port, client port
+HELLO_MSG = struct.Struct('!Bq4sHH')
+HELLO_TAG = 1
 HEARTBEAT_INTERVAL = 2.0
 HEARTBEAT_TIMEOUT = 6.0
+NODE_TIMEOUT = 10.0
+
+# ring datagrams: tag, arg (node id), sender id, sender seq
+RING_MSG = struct.Struct('!BqqQ')
+ELECTION, LEADER, HEARTBEAT = 1, 2, 3
+RING_NAMES = {ELECTION: 'ELECTION', LEADER: 'LEADER', HEARTBEAT: 'HEARTBEAT'}
+
+# client links carry frames: 4-byte big-endian length + payload
+FRAME_HDR = struct.Struct('!I')
+MAX_FRAME = 64 * 1024
+# unsent bytes a slow chat client may accumulate before it is dropped
+MAX_CLIENT_BACKLOG = 1024 * 1024
+# recv_into scratch size, and how many full reads one readiness event may drain
+RECV_CHUNK = 4096
+MAX_DRAIN = 16
+# kernel socket buffer size for chat connections
+SOCK_BUF = 1 << 20
 
 
 def get_local_ip():
@@ -38,19 +66,81 @@ def get_local_ip():
         return '127.0.0.1'
 
 
+if hasattr(select, 'epoll'):
+    NOT_EPOLLIN = ~select.EPOLLIN
+    NOT_EPOLLOUT = ~select.EPOLLOUT
+
+    class EpollDispatcher(selectors.EpollSelector):
+        """EpollSelector with the per-event attribute lookups hoisted out of select()."""
+
+        def select(self, timeout=None):
+            if timeout is None:
+                timeout = -1
+            elif timeout <= 0:
+                timeout = 0
+            else:
+                # epoll_wait() has millisecond resolution; round up
+                timeout = math.ceil(timeout * 1e3) * 1e-3
+            fd_to_key = self._fd_to_key
+            max_ev = len(fd_to_key) or 1
+            try:
+                fd_event_list = self._selector.poll(timeout, max_ev)
+            except InterruptedError:
+                return []
+            ready = []
+            append = ready.append
+            get_key = fd_to_key.get
+            for fd, event in fd_event_list:
+                key = get_key(fd)
+                if key:
+                    events = 0
+                    if event & NOT_EPOLLIN:
+                        events |= selectors.EVENT_WRITE
+                    if event & NOT_EPOLLOUT:
+                        events |= selectors.EVENT_READ
+                    append((key, events & key.events))
+            return ready
+else:
+    # no epoll (Windows, macOS): fall back to the platform's best selector
+    EpollDispatcher = selectors.DefaultSelector
+
+
+def pack_frame(payload):
+    return FRAME_HDR.pack(len(payload)) + payload
+
+
+def send_frame(sock, payload):
+    sock.sendall(pack_frame(payload))
+
+
 class Node:
     def __init__(self, node_id=None, host=None):
         self.id = node_id if node_id is not None else random.randint(1, 10000)
         self.local_ip = host if host else get_local_ip()
         self.known = {}  # id -> (host, ring_port, client_port, last_seen)
         self.known[self.id] = (self.local_ip, None, None, time.time())
+        # sorted live ids for neighbor lookup, min-heap of (expires, id) for pruning
+        self._ids = [self.id]
+        self._expiry = []
         self.ring_port = None
         self.client_port = None
         self.rname = input("Enter your room name: ").strip()
+        # prepended to every relayed chat message
+        self._chat_prefix = f"[{self.rname}] ".encode()
 
         self.neighbor = None  # (id, host, ring_port)
         self.left = None
 
+        # seq of our ring datagrams; starts from the clock so a restarted
+        # node is not mistaken for a duplicate
+        self._ring_seq = itertools.count(int(time.time() * 1000))
+        self._seen = {}  # sender id -> last seq received
+        self._ring_handlers = {
+            ELECTION: self._on_election_msg,
+            LEADER: self._on_leader_msg,
+            HEARTBEAT: self._on_heartbeat,
+        }
+
         self.leader_id = None
         self.last_heartbeat = 0
 
@@ -60,47 +150,67 @@ class Node:
 
         self._stop = threading.Event()
 
-        # TCP servers
-        self._ring_server_sock = None
+        # multicast (UDP), ring (UDP) and client (TCP) sockets
+        self._mcast_sock = None
+        self._hello_sock = None
+        self._ring_udp = None
         self._client_server_sock = None
 
-        # connected chat clients (only at leader)
-        self.clients = []
-
-    def start(self):
-        # start TCP servers
-        self._start_tcp_servers()
-
-        # start discovery listener/sender
-        threading.Thread(target=self._discovery_sender, daemon=True).start()
-        threading.Thread(target=self._discovery_listener, daemon=True).start()
+        # one selector serves every socket; key.data is the event callback
+        self._sel = EpollDispatcher()
+        # min-heap of (due, seq, callback) run from the same loop
+        self._timers = []
+        self._timer_seq = itertools.count()
 
-        # start ring acceptor
-        threading.Thread(target=self._ring_accept_loop, daemon=True).start()
+        # connected chat clients (only at leader), keyed by fileno
+        self.clients = {}  # fd -> conn
+        self._client_in = {}  # fd -> bytearray of unparsed frames
+        self._recv_view = memoryview(bytearray(RECV_CHUNK))  # shared recv_into buffer
+        # client sockets are nonblocking; bytes the kernel did not take yet
+        self._client_out = {}  # fd -> bytearray
 
-        # start client acceptor
-        threading.Thread(target=self._client_accept_loop, daemon=True).start()
+    def start(self):
+        # start ring/client servers
+        self._start_servers()
 
-        # background ring builder
-        threading.Thread(target=self._ring_maintainer, daemon=True).start()
+        # discovery, ring and client sockets all run on one event loop
+        self._sel.register(self._mcast_sock, selectors.EVENT_READ, self._on_hello)
+        self._sel.register(self._ring_udp, selectors.EVENT_READ, self._on_ring_datagram)
+        self._sel.register(self._client_server_sock, selectors.EVENT_READ, self._accept_client)
 
-        # heartbeat & monitor
-        threading.Thread(target=self._heartbeat_loop, daemon=True).start()
+        # periodic work runs as timers on the same loop:
+        # discovery sender, ring builder, heartbeat & monitor
+        self._call_every(HELLO_INTERVAL, self._send_hello)
+        self._call_every(1.0, self._maintain_ring)
+        self._call_every(HEARTBEAT_INTERVAL, self._heartbeat_tick)
 
         # start initial election after short delay to allow discovery
-        threading.Timer(2.0, self.start_election).start()
+        self._call_later(2.0, self.start_election)
 
     def stop(self):
         self._stop.set()
 
-    def _start_tcp_servers(self):
-        # ring server: used to talk to neighbor nodes
-        rs = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        rs.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    def _start_servers(self):
+        # discovery socket: multicast HELLOs from all nodes
+        ms = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        ms.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        ms.bind(('', MCAST_PORT))
+        mreq = struct.pack("4sl", socket.inet_aton(MCAST_GRP), socket.INADDR_ANY)
+        ms.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
+        ms.setblocking(False)
+        self._mcast_sock = ms
+
+        hs = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        # set TTL so multicast stays local
+        hs.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 2)
+        self._hello_sock = hs
+
+        # ring socket: UDP datagrams to/from neighbor nodes
+        rs = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
         rs.bind(('0.0.0.0', 0))
-        rs.listen()
+        rs.setblocking(False)
         self.ring_port = rs.getsockname()[1]
-        self._ring_server_sock = rs
+        self._ring_udp = rs
 
         # client server: only leader accepts
         cs = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -112,190 +222,302 @@ class Node:
 
         # register our actual ports and IP in known table for correct ring formation
         self.known[self.id] = (self.local_ip, self.ring_port, self.client_port, time.time())
+        # id, ip and ports are fixed from here on: pack the HELLO once
+        self._hello = HELLO_MSG.pack(HELLO_TAG, self.id, socket.inet_aton(self.local_ip),
+                                     self.ring_port, self.client_port)
         print(f"Node {self.id} listening: ring_port={self.ring_port} client_port={self.client_port}")
 
-    def _discovery_sender(self):
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
-        # set TTL so multicast stays local
-        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 2)
-        while not self._stop.is_set():
-            msg = f"HELLO {self.id} {self.local_ip} {self.ring_port} {self.client_port}"
-            sock.sendto(msg.encode(), (MCAST_GRP, MCAST_PORT))
-            time.sleep(HELLO_INTERVAL)
-
-    def _discovery_listener(self):
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
-        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        sock.bind(('', MCAST_PORT))
-        mreq = struct.pack("4sl", socket.inet_aton(MCAST_GRP), socket.INADDR_ANY)
-        sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
-        while not self._stop.is_set():
+    def _send_hello(self):
+        try:
+            self._hello_sock.sendto(self._hello, (MCAST_GRP, MCAST_PORT))
+        except OSError:
+            pass
+
+    def _call_later(self, delay, fn):
+        heapq.heappush(self._timers, (time.monotonic() + delay, next(self._timer_seq), fn))
+
+    def _call_every(self, interval, fn):
+        # first run right away, then every interval
+        @functools.wraps(fn)
+        def tick():
             try:
-                data, addr = sock.recvfrom(1024)
-            except OSError:
-                break
-            s = data.decode().strip().split()
-            if len(s) >= 5 and s[0] == 'HELLO':
-                nid = int(s[1])
-                host = s[2]
-                ring_p = int(s[3])
-                client_p = int(s[4])
-                # record last seen, host, and ports
-                self.known[nid] = (host, ring_p, client_p, time.time())
-
-    def _ring_maintainer(self):
-        # periodically trim stale nodes and recompute ring neighbors
+                fn()
+            finally:
+                # keep the schedule even if this run failed
+                self._call_later(interval, tick)
+        self._call_later(0, tick)
+
+    def run(self):
+        # event loop: runs on the caller's thread until stop()
+        sel = self._sel
+        timers = self._timers
         while not self._stop.is_set():
+            now = time.monotonic()
+            while timers and timers[0][0] <= now:
+                self._dispatch(heapq.heappop(timers)[2])
+            # sleep until the next timer is due (at most 1 s to notice stop())
+            timeout = min(timers[0][0] - now, 1.0) if timers else 1.0
+            # a failing select() is fatal: let it propagate out of main()
+            events = sel.select(timeout)
+            for key, mask in events:
+                self._dispatch(key.data, key, mask)
+
+    def _dispatch(self, fn, *args):
+        # one failing callback must not stop discovery, ring and chat
+        try:
+            fn(*args)
+        except Exception:
+            print(f"Node {self.id} error in {getattr(fn, '__name__', fn)}:")
+            traceback.print_exc()
+
+    def _on_hello(self, key, mask):
+        try:
+            data, addr = key.fileobj.recvfrom(1024)
+        except OSError:
+            return
+        if len(data) != HELLO_MSG.size:
+            return
+        tag, nid, ip, ring_p, client_p = HELLO_MSG.unpack(data)
+        if tag == HELLO_TAG:
+            host = socket.inet_ntoa(ip)
             now = time.time()
-            # remove nodes not seen for a while
-            torem = [nid for nid, v in list(self.known.items()) if now - v[3] > 10 and nid != self.id]
-            for nid in torem:
+            if nid not in self.known:
+                bisect.insort(self._ids, nid)
+                heapq.heappush(self._expiry, (now + NODE_TIMEOUT, nid))
+            # record last seen, host, and ports
+            self.known[nid] = (host, ring_p, client_p, now)
+
+    def _maintain_ring(self):
+        # trim stale nodes and recompute ring neighbors
+        now = time.time()
+        # remove nodes not seen for a while; only due heap entries are
+        # checked, nodes heard from since are rescheduled
+        while self._expiry and self._expiry[0][0] <= now:
+            _, nid = heapq.heappop(self._expiry)
+            due = self.known[nid][3] + NODE_TIMEOUT
+            # same test as the pop above, so a re-pushed entry is always later than now
+            if due <= now:
                 del self.known[nid]
+                del self._ids[bisect.bisect_left(self._ids, nid)]
+            else:
+                heapq.heappush(self._expiry, (due, nid))
+
+        # our own id is never pruned
+        ids = self._ids
+        i = bisect.bisect_left(ids, self.id)
+        right = ids[(i + 1) % len(ids)]
+        left = ids[(i - 1) % len(ids)]
+        right_host, rp, cp, _ = self.known[right]
+        left_host, lp, lcp, _ = self.known[left]
+
+        # neighbor info: use actual host
+        if rp is not None:
+            new_neighbor = (right, right_host, rp)
+        else:
+            new_neighbor = None
+        new_left = (left, left_host, lp) if lp is not None else None
+        # log neighbor changes
+        if new_neighbor != self.neighbor or new_left != self.left:
+            self.neighbor = new_neighbor
+            self.left = new_left
+            print(f"Node {self.id} neighbors updated: left={self.left} right={self.neighbor}")
+
+            # --- NEW: if leader is unknown after a topology change, (re)start election ---
+            if self.leader_id is None and self.neighbor is not None: # ab hier hinzugefügt bis time sleep
+                now2 = time.time()
+                # cooldown avoids spamming elections every second
+                if (not self.in_election) and (now2 - self.last_election_start > 2.0):
+                    self.in_election = True
+                    self.last_election_start = now2
+                    print(f"Node {self.id} no leader after neighbor update -> starting election")
+                    self.start_election()
 
-            ids = sorted([nid for nid in self.known.keys()])
-            if ids:
-                # find our index
-                if self.id in ids:
-                    i = ids.index(self.id)
-                    right = ids[(i + 1) % len(ids)]
-                    left = ids[(i - 1) % len(ids)]
-                    right_host, rp, cp, _ = self.known[right]
-                    left_host, lp, lcp, _ = self.known[left]
-                    # neighbor info: use actual host
-                    if rp is not None:
-                        new_neighbor = (right, right_host, rp)
-                    else:
-                        new_neighbor = None
-                    new_left = (left, left_host, lp) if lp is not None else None
-                    # log neighbor changes
-                    if new_neighbor != self.neighbor or new_left != self.left:
-                        self.neighbor = new_neighbor
-                        self.left = new_left
-                        print(f"Node {self.id} neighbors updated: left={self.left} right={self.neighbor}")
-
-                        # --- NEW: if leader is unknown after a topology change, (re)start election ---
-                        if self.leader_id is None and self.neighbor is not None: # ab hier hinzugefügt bis time sleep
-                            now2 = time.time()
-                            # cooldown avoids spamming elections every second
-                            if (not self.in_election) and (now2 - self.last_election_start > 2.0):
-                                self.in_election = True
-                                self.last_election_start = now2
-                                print(f"Node {self.id} no leader after neighbor update -> starting election")
-                                self.start_election()
-            time.sleep(1.0)
-
-    def _connect_to_neighbor(self):
-        if not self.neighbor:
-            return None
-        nid, host, port = self.neighbor
+    def _on_ring_datagram(self, key, mask):
         try:
-            s = socket.create_connection((host, port), timeout=2)
-            return s
-        except Exception:
-            print(f"Node {self.id} failed connect to neighbor {self.neighbor}")
-            return None
+            data, addr = key.fileobj.recvfrom(1024)
+        except OSError:
+            return
+        if len(data) != RING_MSG.size:
+            return
+        tag, arg, sender, seq = RING_MSG.unpack(data)
+        handler = self._ring_handlers.get(tag)
+        if handler is None:
+            return
+        # drop duplicated / reordered datagrams from the same sender
+        if seq <= self._seen.get(sender, -1):
+            return
+        self._seen[sender] = seq
+        print(f"Node {self.id} received ring msg: {RING_NAMES[tag]} {arg}")
+        handler(arg)
 
-    def _ring_accept_loop(self):
-        sock = self._ring_server_sock
-        while not self._stop.is_set():
+    def _accept_client(self, key, mask):
+        try:
+            conn, addr = key.fileobj.accept()
+        except OSError:
+            return
+        # Only leader handles clients
+        if self.leader_id == self.id:
+            print(f"Leader {self.id} accepted client {addr}")
+            # small chat frames go out immediately; large buffer for fan-out
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            conn.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCK_BUF)
+            conn.setblocking(False)
+            fd = conn.fileno()
+            self.clients[fd] = conn
+            self._client_in[fd] = bytearray()
+            self._sel.register(conn, selectors.EVENT_READ, self._on_client_event)
             try:
-                conn, addr = sock.accept()
-            except OSError:
-                break
-            print(f"Node {self.id} accepted ring connection from {addr}")
-            threading.Thread(target=self._handle_ring_conn, args=(conn,), daemon=True).start()
-
-    def _handle_ring_conn(self, conn):
-        with conn:
-            f = conn.makefile('r')
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                print(f"Node {self.id} received ring msg: {line}")
-                parts = line.split()
-                cmd = parts[0]
-                if cmd == 'ELECTION':
-                    eid = int(parts[1])
-                    self._on_election_msg(eid)
-                elif cmd == 'LEADER':
-                    lid = int(parts[1])
-                    self._on_leader_msg(lid)
-                elif cmd == 'HEARTBEAT':
-                    lid = int(parts[1])
-                    self._on_heartbeat(lid)
-
-    def _client_accept_loop(self):
-        sock = self._client_server_sock
-        while not self._stop.is_set():
+                self._send_client(fd, pack_frame(b"WELCOME"))
+            except Exception:
+                self._drop_client(fd)
+        else:
+            # politely close
+            try:
+                send_frame(conn, b"NOT_LEADER")
+            except Exception:
+                pass
+            conn.close()
+
+    def _on_client_event(self, key, mask):
+        fd = key.fd
+        if fd not in self.clients:
+            # dropped earlier in this batch
+            return
+        if mask & selectors.EVENT_WRITE and not self._flush_client(fd):
+            return
+        if mask & selectors.EVENT_READ:
+            self._read_client(fd)
+
+    def _read_client(self, fd):
+        conn = self.clients[fd]
+        buf = self._client_in[fd]
+        view = self._recv_view
+        for _ in range(MAX_DRAIN):
             try:
-                conn, addr = sock.accept()
+                n = conn.recv_into(view)
+            except BlockingIOError:
+                return
             except OSError:
+                n = 0
+            if n == 0:
+                self._drop_client(fd)
+                return
+            buf += view[:n]
+            if not self._handle_client_frames(fd, buf):
+                return
+            # a short read means the socket is drained: skip the recv that
+            # would only return EAGAIN and wait for the next readiness event
+            if n < len(view):
+                return
+
+    def _handle_client_frames(self, fd, buf):
+        # returns False if the client had to be dropped
+        hdr = FRAME_HDR.size
+        while len(buf) >= hdr:
+            (n,) = FRAME_HDR.unpack_from(buf)
+            if n > MAX_FRAME:
+                self._drop_client(fd)
+                return False
+            end = hdr + n
+            if len(buf) < end:
                 break
-            # Only leader handles clients
-            if self.leader_id == self.id:
-                try:
-                    conn.sendall(b"WELCOME\n")
-                except Exception:
-                    pass
-                print(f"Leader {self.id} accepted client {addr}")
-                self.clients.append(conn)
-                threading.Thread(target=self._handle_client, args=(conn,), daemon=True).start()
-            else:
-                # politely close
-                conn.sendall(b"NOT_LEADER\n")
-                conn.close()
-
-    def _handle_client(self, conn):
-        with conn:
-            f = conn.makefile('r')
-        for line in f:
-            msg = line.rstrip('\n')
+            msg = bytes(buf[hdr:end])
+            del buf[:end]
             if not msg:
                 continue
 
             # NEW: refuse if not leader anymore
             if self.leader_id != self.id:
                 try:
-                    conn.sendall(b"NOT_LEADER\n")
+                    self._send_client(fd, pack_frame(b"NOT_LEADER"))
                 except Exception:
                     pass
                 # close -> client will reconnect and resend
-                return
-
-            self._broadcast_to_clients(f"[{self.rname}] {msg}")
-
+                self._drop_client(fd)
+                return False
+
+            self._broadcast_to_clients(self._chat_prefix + msg)
+        # broadcasting may have dropped this client too
+        return fd in self.clients
+
+    def _send_client(self, fd, data):
+        # queue behind earlier unsent bytes to keep frames in order
+        out = self._client_out.get(fd)
+        if out is not None:
+            if len(out) + len(data) > MAX_CLIENT_BACKLOG:
+                raise OSError("client send backlog full")
+            out += data
+            return
+        conn = self.clients[fd]
+        try:
+            n = conn.send(data)
+        except BlockingIOError:
+            n = 0
+        if n < len(data):
+            self._client_out[fd] = bytearray(data[n:])
+            self._sel.modify(conn, selectors.EVENT_READ | selectors.EVENT_WRITE, self._on_client_event)
+
+    def _flush_client(self, fd):
+        # returns False if the client had to be dropped
+        out = self._client_out.get(fd)
+        if out is None:
+            return True
+        conn = self.clients[fd]
+        try:
+            n = conn.send(out)
+        except BlockingIOError:
+            return True
+        except OSError:
+            self._drop_client(fd)
+            return False
+        del out[:n]
+        if not out:
+            del self._client_out[fd]
+            self._sel.modify(conn, selectors.EVENT_READ, self._on_client_event)
+        return True
+
+    def _drop_client(self, fd):
+        conn = self.clients.pop(fd, None)
+        if conn is None:
+            return
+        self._client_in.pop(fd, None)
+        self._client_out.pop(fd, None)
+        try:
+            self._sel.unregister(conn)
+        except (KeyError, ValueError):
+            pass
+        try:
+            conn.close()
+        except Exception:
+            pass
 
-    def _broadcast_to_clients(self, text):
+    def _broadcast_to_clients(self, payload):
+        # frame once, every client gets the same bytes
+        frame = pack_frame(payload)
         dead = []
-        for c in list(self.clients):
+        for fd in self.clients:
             try:
-                c.sendall((text + "\n").encode())
+                self._send_client(fd, frame)
             except Exception:
-                dead.append(c)
-        for d in dead:
-            try:
-                d.close()
-            except Exception:
-                pass
-            if d in self.clients:
-                self.clients.remove(d)
+                dead.append(fd)
+        for fd in dead:
+            self._drop_client(fd)
 
     def start_election(self):
         print(f"Node {self.id} initiating election")
-        self._send_ring_message(f"ELECTION {self.id}")
+        self._send_ring_message(ELECTION, self.id)
 
-    def _send_ring_message(self, text):
-        s = self._connect_to_neighbor()
-        if not s:
-            # couldn't reach neighbor; try later
+    def _send_ring_message(self, tag, arg):
+        neighbor = self.neighbor
+        if not neighbor:
+            # no neighbor yet; try later
             return
+        nid, host, port = neighbor
+        msg = RING_MSG.pack(tag, arg, self.id, next(self._ring_seq))
         try:
-            s.sendall((text + "\n").encode())
-        except Exception:
-            pass
-        finally:
-            s.close()
+            self._ring_udp.sendto(msg, (host, port))
+        except OSError:
+            print(f"Node {self.id} failed send to neighbor {neighbor}")
 
     def _on_election_msg(self, eid):
         if eid == self.id:
@@ -304,13 +526,13 @@ class Node:
             self.in_election = False
             print(f"Node {self.id} became leader")
             # announce
-            self._send_ring_message(f"LEADER {self.id}")
+            self._send_ring_message(LEADER, self.id)
         elif eid > self.id:
             # forward the larger id
-            self._send_ring_message(f"ELECTION {eid}")
+            self._send_ring_message(ELECTION, eid)
         else:
             # received smaller id: LCR rule -> send our own id
-            self._send_ring_message(f"ELECTION {self.id}")
+            self._send_ring_message(ELECTION, self.id)
 
     def _on_leader_msg(self, lid: int):
     # akzeptiere nur, wenn neuer Leader "gleich stark oder stärker" ist
@@ -321,7 +543,7 @@ class Node:
 
         # weiterleiten (aber nicht, wenn wir selbst der Ursprung sind)
         if lid != self.id:
-            self._send_ring_message(f"LEADER {lid}")
+            self._send_ring_message(LEADER, lid)
         else:
         # älteren/schwächeren Leader ignorieren
             return
@@ -335,31 +557,37 @@ class Node:
 
         # weiterleiten (nicht, wenn es von uns selbst stammt)
         if lid != self.id:
-            self._send_ring_message(f"HEARTBEAT {lid}")
+            self._send_ring_message(HEARTBEAT, lid)
         else:
         # Heartbeat von "schwächerem" Leader ignorieren
             return
 
 
-    def _heartbeat_loop(self):
-        while not self._stop.is_set():
-            if self.leader_id == self.id:
-                # leader sends heartbeat around ring
-                self._send_ring_message(f"HEARTBEAT {self.id}")
-                # also announce leader client readiness
-                # leader will accept clients automatically
-            else:
-                # check timeout
-                if self.leader_id and time.time() - self.last_heartbeat > HEARTBEAT_TIMEOUT:
-                    print(f"Node {self.id} detects leader timeout; starting election")
-                    self.leader_id = None
-                    self.start_election()
-            time.sleep(HEARTBEAT_INTERVAL)
+    def _heartbeat_tick(self):
+        if self.leader_id == self.id:
+            # leader sends heartbeat around ring
+            self._send_ring_message(HEARTBEAT, self.id)
+            # also announce leader client readiness
+            # leader will accept clients automatically
+        else:
+            # check timeout
+            if self.leader_id and time.time() - self.last_heartbeat > HEARTBEAT_TIMEOUT:
+                print(f"Node {self.id} detects leader timeout; starting election")
+                self.leader_id = None
+                self.start_election()
+
+
+def node_id_arg(value):
+    # ids travel as signed 64-bit in HELLO and ring datagrams
+    nid = int(value)
+    if not -2**63 <= nid < 2**63:
+        raise argparse.ArgumentTypeError(f"node id {value} does not fit in 64 bits")
+    return nid
 
 
 def main():
     p = argparse.ArgumentParser()
-    p.add_argument('--id', type=int, help='Optional node id (integer)')
+    p.add_argument('--id', type=node_id_arg, help='Optional node id (integer)')
     p.add_argument('--host', type=str, help='Optional IP address to bind to (use this if on multiple networks)')
     args = p.parse_args()
     node = Node(node_id=args.id, host=args.host)
@@ -367,8 +595,7 @@ def main():
     try:
         node.start()
         # run until ctrl-c
-        while True:
-            time.sleep(1)
+        node.run()
     except KeyboardInterrupt:
         print('Shutting down')
         node.stop()